@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+#
+# Lists the transitive build dependencies (BUILD_REQUIRES/BUILD_PREREQUIRES)
+# of one or more ports in this HaikuPorts tree.
+#
+# Dependencies are resolved through the PROVIDES entries of every recipe,
+# so names like cmd:xgettext find the port that actually provides them
+# instead of guessing a package directory from the name.
+#
+# Usage: get_build_dependencies.py <port-or-provides> [...]
+#
+# Distributed under the terms of the MIT License.
+
+import mmap
+import os
+import pickle
+import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+HAIKUPORTS_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Fixed prefixes/suffixes handled on every token of every
+# PROVIDES/BUILD_REQUIRES block in the tree; plain str methods beat even
+# a compiled regex for literal matching.
+_PREFIXES = ("cmd:", "lib:", "devel:", "hpkg:", "data:", "source:",
+	"generic:", "package:")
+_ARCH_SUFFIXES = ("_x86_gcc2", "_x86_64", "_x86", "_gcc2", "_any",
+	"_source")
+# Recipe variables stripped from entries, in one alternation instead of
+# a str.replace per spelling; most tokens carry no '$' and skip the sub
+# call entirely.
+_VARS_RE = re.compile(
+	r'\$\{?(?:secondaryArchSuffix|portVersion|portName|arch'
+	r'|effectiveTargetArchitecture|majorVersion|minorVersion)\}?')
+# Everything after a version specifier, '%' or space is irrelevant; one
+# split at the earliest delimiter replaces a chain of sequential splits.
+_DELIM_RE = re.compile(r"[ =<>%]")
+# The block names, in one place: they define the extraction pattern and
+# the default sections of parse_recipe.
+_BLOCK_NAMES = ('PROVIDES', 'BUILD_REQUIRES', 'BUILD_PREREQUIRES')
+# One multiline pass over the whole recipe text finds every block
+# assignment; the value is a quoted (possibly multi-line) block or a bare
+# word, and indented assignments inside shell conditionals count too.
+_BLOCK_RE = re.compile(
+	r'^[ \t]*(' + '|'.join(_BLOCK_NAMES) + r')='
+	r'(?:"([^"]*)"|(\S+))', re.M)
+# Metadata always precedes the phase functions, so reading can stop at
+# the first of them; the remainder of the recipe is build script.
+_FUNCTION_RE = re.compile(r'^(?:BUILD|INSTALL|TEST)\(\)', re.M)
+
+_READ_CHUNK_SIZE = 16384
+
+# Bytes twin of _BLOCK_RE for the PROVIDES-only index scan over mmap.
+_PROVIDES_BYTES_RE = re.compile(
+	br'^[ \t]*PROVIDES=(?:"([^"]*)"|(\S+))', re.M)
+
+
+def _clean_recipe_item(item_str):
+	"""Reduce one PROVIDES/REQUIRES entry to a bare, comparable name."""
+	item_str = item_str.strip()
+	if not item_str:
+		return None
+
+	prefix = ""
+	for p in _PREFIXES:
+		if item_str.startswith(p):
+			prefix = p
+			item_str = item_str[len(p):]
+			break
+
+	if '$' in item_str:
+		item_str = _VARS_RE.sub("", item_str)
+
+	item_str = _DELIM_RE.split(item_str, 1)[0]
+
+	for suffix in _ARCH_SUFFIXES:
+		if item_str.endswith(suffix):
+			item_str = item_str[:-len(suffix)]
+			break
+	if item_str.endswith("_primaryArch"):
+		item_str = item_str[:-len("_primaryArch")]
+
+	item_str = item_str.strip()
+	if not item_str or item_str.startswith("$"):
+		return None
+	# The same short names recur across thousands of recipes; interning
+	# dedupes them and lets set/dict probes compare by identity first.
+	return sys.intern(prefix + item_str)
+
+
+_SECTION_KEYS = {
+	'PROVIDES': 'provides',
+	'BUILD_REQUIRES': 'build_requires',
+	'BUILD_PREREQUIRES': 'build_prerequires',
+}
+
+# Per-run cache: recipe path -> (sections parsed so far, result dict).
+# The index build reads PROVIDES of every recipe and the resolver later
+# wants the BUILD_* blocks of many of the same files; without the cache
+# each of those files would be opened and tokenized twice.
+_PARSE_CACHE = {}
+
+
+def parse_recipe(recipe_path, sections=None):
+	"""Parse the PROVIDES/BUILD_REQUIRES/BUILD_PREREQUIRES of a recipe.
+
+	sections limits which of the three blocks are extracted; assignments
+	to the others are then not even tokenized.
+	"""
+	if sections is None:
+		sections = _BLOCK_NAMES
+	requested = frozenset(sections)
+	cached_sections, cached_parsed = _PARSE_CACHE.get(recipe_path,
+		(frozenset(), None))
+	if cached_parsed is not None and requested <= cached_sections:
+		return cached_parsed
+
+	parsed = {
+		'provides': set(),
+		'build_requires': set(),
+		'build_prerequires': set(),
+	}
+	block_to_set_map = {name: parsed[_SECTION_KEYS[name]]
+		for name in sections}
+
+	parts = []
+	with open(recipe_path, 'r', encoding='utf-8', errors='replace') as f:
+		while True:
+			chunk = f.read(_READ_CHUNK_SIZE)
+			if not chunk:
+				break
+			# Probe with a little overlap so a marker split across two
+			# chunks is still seen; the precise cut happens after the
+			# join.
+			probe = parts[-1][-16:] + chunk if parts else chunk
+			parts.append(chunk)
+			if _FUNCTION_RE.search(probe) is not None:
+				break
+	text = ''.join(parts)
+	match = _FUNCTION_RE.search(text)
+	if match is not None:
+		text = text[:match.start()]
+	text = text.replace('\\\n', ' ')
+
+	for match in _BLOCK_RE.finditer(text):
+		target_set = block_to_set_map.get(match.group(1))
+		if target_set is None:
+			continue
+		content = match.group(2)
+		if content is None:
+			content = match.group(3)
+		# Entries are one per line within a block.
+		for entry_line in content.splitlines():
+			cleaned = _clean_recipe_item(entry_line.partition('#')[0])
+			if cleaned is not None:
+				target_set.add(cleaned)
+
+	if cached_parsed is not None:
+		for name in requested:
+			key = _SECTION_KEYS[name]
+			cached_parsed[key] |= parsed[key]
+		_PARSE_CACHE[recipe_path] = (cached_sections | requested,
+			cached_parsed)
+		return cached_parsed
+
+	_PARSE_CACHE[recipe_path] = (requested, parsed)
+	return parsed
+
+
+def _parse_provides(recipe_path):
+	"""Index-build fast path: extract only the PROVIDES entries.
+
+	Scans the file as bytes through mmap, so nothing but the matched
+	block contents is ever decoded.
+	"""
+	provides = set()
+	with open(recipe_path, 'rb') as f:
+		try:
+			mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		except ValueError:
+			return provides
+		with mapped:
+			for match in _PROVIDES_BYTES_RE.finditer(mapped):
+				content = match.group(1)
+				if content is None:
+					content = match.group(2)
+				content = content.decode('utf-8', 'replace')
+				for entry_line in content.splitlines():
+					cleaned = _clean_recipe_item(
+						entry_line.partition('#')[0])
+					if cleaned is not None:
+						provides.add(cleaned)
+	return provides
+
+
+def _find_recipe_paths(haikuports_root):
+	"""Discover every recipe in the tree in one scandir walk.
+
+	Returns the full recipe paths (so nothing downstream re-joins path
+	components) and the newest recipe mtime, taken from the DirEntry
+	stat data the walk already has.
+	"""
+	recipe_paths = []
+	newest_mtime = 0
+	with os.scandir(haikuports_root) as root_it:
+		category_dirs = [entry.path for entry in root_it
+			if '-' in entry.name and entry.is_dir(follow_symlinks=False)]
+	for category_path in category_dirs:
+		with os.scandir(category_path) as category_it:
+			for package_entry in category_it:
+				if not package_entry.is_dir(follow_symlinks=False):
+					continue
+				with os.scandir(package_entry.path) as package_it:
+					for file_entry in package_it:
+						if file_entry.name.endswith('.recipe') \
+								and file_entry.is_file(
+									follow_symlinks=False):
+							recipe_paths.append(file_entry.path)
+							mtime = file_entry.stat().st_mtime_ns
+							if mtime > newest_mtime:
+								newest_mtime = mtime
+	return recipe_paths, newest_mtime
+
+
+# On-disk copy of the provides index; rebuilding it means re-parsing
+# every recipe, while validating it only needs the stat data the
+# discovery walk produces anyway.
+_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache",
+	"haikuports-resolver", "provides_index.pickle")
+
+
+def build_provides_index(haikuports_root, use_cache=True):
+	"""Map every PROVIDES entry in the tree to its recipe file.
+
+	When several recipes provide the same name (multiple versions of a
+	port, or genuinely competing ports), the first one found wins. The
+	built index is kept in a pickle keyed on the recipe count and newest
+	recipe mtime, so back-to-back runs on an unchanged tree skip the
+	whole parse.
+	"""
+	recipe_paths, newest_mtime = _find_recipe_paths(haikuports_root)
+	cache_key = (len(recipe_paths), newest_mtime)
+	if use_cache:
+		try:
+			with open(_CACHE_FILE, 'rb') as f:
+				cached_key, cached_index = pickle.load(f)
+			if cached_key == cache_key:
+				return cached_index
+		except (OSError, pickle.PickleError, ValueError, EOFError):
+			pass
+
+	# Parsing the recipes is pure CPU work on independent files; shard it
+	# across cores and keep the first-found merge in this process so the
+	# index stays deterministic.
+	provides_index = {}
+	with ProcessPoolExecutor() as executor:
+		for recipe_path, provides in zip(recipe_paths,
+				executor.map(_parse_provides, recipe_paths,
+					chunksize=64)):
+			for provided_name in provides:
+				# Results crossed a process boundary, so re-intern here.
+				provided_name = sys.intern(provided_name)
+				if provided_name not in provides_index:
+					provides_index[provided_name] = recipe_path
+
+	if use_cache:
+		try:
+			os.makedirs(os.path.dirname(_CACHE_FILE), exist_ok=True)
+			with open(_CACHE_FILE, 'wb') as f:
+				pickle.dump((cache_key, provides_index), f)
+		except OSError:
+			pass
+	return provides_index
+
+
+def build_base_name_index(provides_index):
+	"""Group the index keys by their unprefixed name.
+
+	Lets main() turn a bare user argument into the matching provides key
+	with one dict lookup instead of probing every prefix.
+	"""
+	base_to_keys = {}
+	for key in provides_index:
+		for prefix in _PREFIXES:
+			if key.startswith(prefix):
+				base_to_keys.setdefault(key[len(prefix):], []).append(key)
+				break
+	return base_to_keys
+
+
+def resolve_dependencies_recursive(dependency_name, provides_index,
+		all_deps_set, processed_recipe_paths_set):
+	"""Collect everything dependency_name transitively pulls in."""
+	work = deque([dependency_name])
+	while work:
+		name = work.popleft()
+		recipe_path = provides_index.get(name)
+		if recipe_path is None \
+				or recipe_path in processed_recipe_paths_set:
+			continue
+		processed_recipe_paths_set.add(recipe_path)
+
+		parsed_info = parse_recipe(recipe_path)
+		for new_dep_name in chain(parsed_info['build_requires'],
+				parsed_info['build_prerequires']):
+			# Names another branch already enqueued would only bounce
+			# off the processed-path guard after an index lookup; skip
+			# them here.
+			if new_dep_name in all_deps_set:
+				continue
+			all_deps_set.add(new_dep_name)
+			work.append(new_dep_name)
+
+
+def main():
+	use_cache = '--no-cache' not in sys.argv[1:]
+	initial_packages = [arg for arg in sys.argv[1:]
+		if arg != '--no-cache']
+	if not initial_packages:
+		print("usage: %s [--no-cache] <port-or-provides> [...]"
+			% os.path.basename(sys.argv[0]), file=sys.stderr)
+		sys.exit(1)
+
+	provides_index = build_provides_index(HAIKUPORTS_ROOT,
+		use_cache=use_cache)
+	base_to_keys = build_base_name_index(provides_index)
+
+	# One set intersection answers which arguments are index keys as
+	# given; only the rest go through the reverse index.
+	direct_hits = set(initial_packages) & provides_index.keys()
+
+	resolved_keys = []
+	for user_pkg_name in initial_packages:
+		if user_pkg_name in direct_hits:
+			resolved_keys.append(user_pkg_name)
+			continue
+		candidates = base_to_keys.get(user_pkg_name)
+		if candidates:
+			# Prefer prefixes in their declaration order.
+			resolved_keys.append(min(candidates,
+				key=lambda key: _PREFIXES.index(
+					key[:key.index(':') + 1])))
+		else:
+			print("warning: nothing provides %s" % user_pkg_name,
+				file=sys.stderr)
+
+	all_deps_set = set()
+	processed_recipe_paths_set = set()
+	for key in resolved_keys:
+		resolve_dependencies_recursive(key, provides_index, all_deps_set,
+			processed_recipe_paths_set)
+
+	initial_set = set(initial_packages) | set(resolved_keys)
+	for dep in sorted(all_deps_set):
+		for prefix in _PREFIXES:
+			if dep.startswith(prefix):
+				base_name = dep[len(prefix):]
+				break
+		else:
+			base_name = dep
+		if dep in initial_set or base_name in initial_set:
+			continue
+		print(dep)
+
+
+if __name__ == '__main__':
+	main()